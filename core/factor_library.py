@@ -5,7 +5,7 @@ def is_kcb(stock_code):
 
 def is_st(stock_code):
     """判断是否为ST股票"""
-    return stock_code.startswith('ST') or stock_code.startswith('*ST')
+    return stock_code.startswith(('ST', '*ST'))
 
 def is_bj(stock_code):
     """判断是否为北交所股票"""
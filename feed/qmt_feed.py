@@ -55,7 +55,7 @@ class QMTDataFeed(DataFeed):
 
     def _get_sector_info(self):
         """获取板块信息"""
-        return {sector_name: self._xtdata.get_stock_list_in_sector(sector_name) 
+        return {sector_name: self.get_sector_stocks(sector_name) 
                 for sector_name in self._xtdata.get_sector_list() 
                 if 'TGN' in sector_name or 'THY' in sector_name 
                 and '季报' not in sector_name and '年报' not in sector_name}
@@ -82,8 +82,33 @@ class QMTDataFeed(DataFeed):
             logging.error(f"获取股票 {stock_code} 市值失败: {str(e)}")
             return 0.0
 
-    def get_basic_info_df(self):
-        """获取并验证基础数据"""
+    def get_basic_info_df(self, cache_dir='a_share_data/basic_info'):
+        """
+        获取基础数据，结果按日缓存到本地，同一天内重复调用直接读取缓存
+        :param cache_dir: 缓存目录，为None时不使用缓存
+        :return: DataFrame
+        """
+        if not cache_dir:
+            return self._fetch_basic_info_df()
+
+        cache_file = os.path.join(cache_dir, f"{datetime.now().strftime('%Y%m%d')}.pkl")
+        if os.path.exists(cache_file):
+            try:
+                return pd.read_pickle(cache_file)
+            except Exception as e:
+                logging.warning(f"读取基础数据缓存 {cache_file} 失败，重新获取: {str(e)}")
+
+        df = self._fetch_basic_info_df()
+        if not df.empty:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                df.to_pickle(cache_file)
+            except Exception as e:
+                logging.warning(f"保存基础数据缓存 {cache_file} 失败: {str(e)}")
+        return df
+
+    def _fetch_basic_info_df(self):
+        """从QMT获取并验证基础数据"""
         try:
             # 获取所有A股股票代码
             stock_list = self.get_sector_stocks('沪深A股')
@@ -258,12 +283,26 @@ class QMTDataFeed(DataFeed):
 
     def get_sector_stocks(self, sector):
         """
-        获取板块内的股票列表
+        获取板块内的股票列表，板块成分股日内不变，结果按日缓存
         :param sector: 板块名称
         :return: list 股票代码列表
         """
         try:
-            return self._xtdata.get_stock_list_in_sector(sector)
+            # 初始化缓存
+            if not hasattr(self, '_sector_stocks_cache'):
+                self._sector_stocks_cache = {}
+            if not hasattr(self, '_sector_cache_date'):
+                self._sector_cache_date = None
+
+            # 跨日时清空缓存
+            today = datetime.now().date()
+            if self._sector_cache_date != today:
+                self._sector_stocks_cache.clear()
+                self._sector_cache_date = today
+
+            if sector not in self._sector_stocks_cache:
+                self._sector_stocks_cache[sector] = self._xtdata.get_stock_list_in_sector(sector)
+            return list(self._sector_stocks_cache[sector])
         except Exception as e:
             logging.error(f"获取板块 {sector} 的股票列表失败: {str(e)}")
             return []
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from typing import Dict, Any, List
 import logging
+import joblib
 from sklearn.model_selection import TimeSeriesSplit, KFold
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
@@ -19,18 +20,27 @@ class ModelTrainer:
         self.best_score = float('-inf')
         self.last_training_date = None
         self.feature_importance = None
+        self.oof_predictions = None
         
-    def train_models(self, X: pd.DataFrame, y: pd.Series, cv_splits: int = 5):
+    def train_models(self, X: pd.DataFrame, y: pd.Series, cv_splits: int = 5) -> pd.Series:
         """训练多个模型并选择最佳模型
         
         Args:
             X: 特征数据
             y: 目标变量
             cv_splits: 交叉验证折数
+            
+        Returns:
+            最佳模型在交叉验证中的样本外预测，从未进入验证集的样本为NaN
         """
         try:
             # 记录训练期的最后一天
             self.last_training_date = X.index[-1]
+
+            # 每次训练重新选择最佳模型，避免沿用上一次训练的分数和样本外预测
+            self.best_model = None
+            self.best_score = float('-inf')
+            self.oof_predictions = None
             
             # 定义要训练的模型
             models = {
@@ -51,12 +61,14 @@ class ModelTrainer:
                 try:
                     # 交叉验证
                     cv_scores = []
+                    oof_pred = np.full(len(y), np.nan)
                     for train_idx, val_idx in tscv.split(X):
                         X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
                         y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
                         
                         model.fit(X_train, y_train)
                         y_pred = model.predict(X_val)
+                        oof_pred[val_idx] = y_pred
                         score = r2_score(y_val, y_pred)
                         cv_scores.append(score)
                     
@@ -68,6 +80,7 @@ class ModelTrainer:
                     if mean_score > self.best_score:
                         self.best_score = mean_score
                         self.best_model = model
+                        self.oof_predictions = pd.Series(oof_pred, index=X.index)
                         self.logger.info(f"更新最佳模型: {name}")
                     
                     # 保存模型
@@ -85,6 +98,8 @@ class ModelTrainer:
             # 计算特征重要性
             self._calculate_feature_importance(X)
             
+            return self.oof_predictions
+            
         except Exception as e:
             self.logger.error(f"训练模型时出错: {str(e)}")
             raise
@@ -109,7 +124,43 @@ class ModelTrainer:
         }
         
         return metrics
-    
+
+    def evaluate_all(self, X: pd.DataFrame, y: pd.Series) -> Dict[str, Dict[str, float]]:
+        """一次性评估所有已训练模型的性能
+
+        将所有模型的预测结果堆叠为一个矩阵，残差只计算一次，
+        三个指标共用同一个残差矩阵
+
+        Args:
+            X: 特征数据
+            y: 目标变量
+
+        Returns:
+            以模型名称为key、评估指标字典为value的字典
+        """
+        if not self.models:
+            raise ValueError("尚未训练模型")
+
+        names = list(self.models.keys())
+        y_true = np.asarray(y, dtype=np.float64)
+
+        # 形状为 (模型数, 样本数) 的预测矩阵
+        preds = np.stack([np.asarray(self.models[name].predict(X), dtype=np.float64) for name in names])
+        resid = preds - y_true
+
+        sq = resid * resid
+        mse = sq.mean(axis=1)
+        mae = np.abs(resid).mean(axis=1)
+        ss_res = sq.sum(axis=1)
+        ss_tot = ((y_true - y_true.mean()) ** 2).sum()
+        r2 = 1 - ss_res / ss_tot
+        rmse = np.sqrt(mse)
+
+        return {
+            name: {'r2': float(r2[i]), 'mae': float(mae[i]), 'rmse': float(rmse[i])}
+            for i, name in enumerate(names)
+        }
+
     def predict(self, X: pd.DataFrame) -> pd.Series:
         """使用最佳模型进行预测
         
@@ -124,6 +175,44 @@ class ModelTrainer:
             
         return pd.Series(self.best_model.predict(X), index=X.index)
     
+    def save(self, path: str):
+        """保存训练结果
+
+        Args:
+            path: 保存路径
+        """
+        if self.best_model is None:
+            raise ValueError("尚未训练模型")
+
+        state = {
+            'models': self.models,
+            'best_model': self.best_model,
+            'best_score': self.best_score,
+            'last_training_date': self.last_training_date,
+            'feature_importance': self.feature_importance
+        }
+        # 不压缩，便于加载时以内存映射方式读取模型中的numpy数组
+        joblib.dump(state, path, compress=0)
+        self.logger.info(f"模型已保存至 {path}")
+
+    def load(self, path: str, mmap_mode: str = None):
+        """加载训练结果
+
+        默认完整读入内存。mmap_mode仅对直接以numpy数组保存参数的模型有意义，
+        sklearn的树模型在反序列化时会复制节点数组，内存映射不会带来共享
+
+        Args:
+            path: 模型文件路径
+            mmap_mode: 内存映射模式（如'r'），为None时完整读入内存
+        """
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        self.models = state['models']
+        self.best_model = state['best_model']
+        self.best_score = state['best_score']
+        self.last_training_date = state['last_training_date']
+        self.feature_importance = state['feature_importance']
+        self.logger.info(f"已从 {path} 加载模型")
+
     def get_feature_importance(self) -> pd.DataFrame:
         """获取特征重要性
         
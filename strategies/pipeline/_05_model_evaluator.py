@@ -24,10 +24,29 @@ class ModelEvaluator:
             'r2': r2_score(y_true, y_pred),
             'mae': mean_absolute_error(y_true, y_pred),
             'rmse': np.sqrt(mean_squared_error(y_true, y_pred)),
-            'mape': np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+            'mape': self._mape(y_true, y_pred)
         }
-        
+
         return metrics
+
+    @staticmethod
+    def _mape(y_true, y_pred) -> float:
+        """计算平均绝对百分比误差，真实值为0的样本不参与计算
+
+        Args:
+            y_true: 真实值
+            y_pred: 预测值
+
+        Returns:
+            MAPE（百分比），全部真实值为0时返回nan
+        """
+        yt = np.asarray(y_true, dtype=np.float64)
+        yp = np.asarray(y_pred, dtype=np.float64)
+        nonzero = yt != 0
+        if not nonzero.any():
+            return np.nan
+        yt = yt[nonzero]
+        return float(np.abs(np.subtract(yt, yp[nonzero]) / yt).mean() * 100)
     
     def analyze_errors(self, y_true: pd.Series, y_pred: pd.Series) -> Dict[str, Any]:
         """分析预测误差
@@ -182,11 +201,10 @@ class ModelEvaluator:
             returns = pd.Series(y_true, index=y_true.index)
             sharpe_ratio = np.sqrt(252) * returns.mean() / returns.std() if returns.std() != 0 else 0
             
-            # 计算最大回撤
-            cumulative_returns = (1 + returns).cumprod()
-            rolling_max = cumulative_returns.expanding().max()
-            drawdowns = cumulative_returns / rolling_max - 1
-            max_drawdown = drawdowns.min()
+            # 计算最大回撤，缺失收益不参与计算
+            cumulative_returns = np.cumprod(1 + returns.dropna().to_numpy(dtype=np.float64))
+            rolling_max = np.maximum.accumulate(cumulative_returns)
+            max_drawdown = (cumulative_returns / rolling_max - 1).min() if len(cumulative_returns) else np.nan
             
             # 生成报告
             report = {
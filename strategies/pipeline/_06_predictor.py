@@ -19,6 +19,9 @@ class Predictor:
         self.model_trainer = model_trainer
         self.threshold = threshold
         self.prediction_summary = None
+        # 阈值过滤时复用的临时缓冲区
+        self._abs_scratch = None
+        self._mask_scratch = None
         
     def predict(self, X: pd.DataFrame) -> np.ndarray:
         """生成预测
@@ -33,15 +36,17 @@ class Predictor:
             # 获取模型预测
             predictions = self.model_trainer.predict(X)
             
-            # 确保预测结果是numpy数组
-            predictions = np.array(predictions)
+            # 确保预测结果是numpy数组（拷贝一份，后续原地修改）
+            predictions = np.array(predictions, dtype=np.float64)
             
-            # 应用阈值
-            predictions = np.where(
-                np.abs(predictions) > self.threshold,
-                predictions,
-                0
-            )
+            # 应用阈值，复用缓冲区原地置零
+            if self._abs_scratch is None or self._abs_scratch.shape != predictions.shape:
+                self._abs_scratch = np.empty_like(predictions)
+                self._mask_scratch = np.empty(predictions.shape, dtype=bool)
+            np.abs(predictions, out=self._abs_scratch)
+            np.greater(self._abs_scratch, self.threshold, out=self._mask_scratch)
+            np.logical_not(self._mask_scratch, out=self._mask_scratch)
+            predictions[self._mask_scratch] = 0
             
             # 更新预测摘要
             self._update_prediction_summary(predictions)
@@ -73,15 +78,23 @@ class Predictor:
         Args:
             predictions: 预测结果
         """
+        # 用符号直方图一次得到正/负/零的数量，代替三次比较求和
+        sign_counts = np.bincount(np.sign(predictions).astype(np.int8) + 1, minlength=3)
+        
+        # 方差复用均值和偏差数组
+        mean = predictions.mean()
+        deviation = predictions - mean
+        std = np.sqrt(np.dot(deviation, deviation) / len(predictions))
+        
         self.prediction_summary = {
             'total_predictions': len(predictions),
-            'positive_predictions': np.sum(predictions > 0),
-            'negative_predictions': np.sum(predictions < 0),
-            'zero_predictions': np.sum(predictions == 0),
-            'mean_prediction': np.mean(predictions),
-            'std_prediction': np.std(predictions),
-            'max_prediction': np.max(predictions),
-            'min_prediction': np.min(predictions)
+            'positive_predictions': sign_counts[2],
+            'negative_predictions': sign_counts[0],
+            'zero_predictions': sign_counts[1],
+            'mean_prediction': mean,
+            'std_prediction': std,
+            'max_prediction': predictions.max(),
+            'min_prediction': predictions.min()
         }
         
     def get_prediction_summary(self) -> Dict[str, Any]:
@@ -92,7 +92,7 @@ class MultiFactorPipeline:
             print("\n" + "="*50)
             print("阶段3: 准备训练数据")
             print("="*50)
-            X, y = self._prepare_training_data(factor_data, target_time)
+            X, y = self._prepare_training_data(factor_data, processed_data, target_time)
             
             # 4. 特征选择
             print("\n" + "="*50)
@@ -104,15 +104,18 @@ class MultiFactorPipeline:
             print("\n" + "="*50)
             print("阶段5: 训练模型")
             print("="*50)
-            self.model_trainer.train_models(X_selected, y, cv_splits)
+            oof_pred = self.model_trainer.train_models(X_selected, y, cv_splits)
             
             # 6. 评估模型
             print("\n" + "="*50)
             print("阶段6: 评估模型")
             print("="*50)
-            y_pred = self.model_trainer.predict(X_selected)
+            # 直接使用交叉验证得到的样本外预测，无需再做一次推理
+            if oof_pred is None:
+                raise ValueError("尚未训练模型")
+            valid_mask = oof_pred.notna()
             evaluation_report = self.model_evaluator.generate_report(
-                y, y_pred, processed_data
+                y[valid_mask], oof_pred[valid_mask].to_numpy(), processed_data
             )
             
             self.logger.info("模型训练完成")
@@ -125,11 +128,13 @@ class MultiFactorPipeline:
             raise
     
     def _prepare_training_data(self, 
+                             factor_data: Dict[str, pd.DataFrame], 
                              market_data: Dict[str, pd.DataFrame], 
                              target_time: str) -> tuple:
         """准备训练数据
         
         Args:
+            factor_data: 已构建的因子数据
             market_data: 处理后的市场数据
             target_time: 目标时间点
             
@@ -137,24 +142,30 @@ class MultiFactorPipeline:
             X: 特征数据
             y: 目标变量
         """
-        # 计算因子
-        X = self.factor_builder.build_factors(market_data)
-        
-        # 计算目标变量
         # 获取第一个股票的数据
-        first_stock = list(market_data.keys())[0]
+        first_stock = next(iter(market_data))
         tick_data = market_data[first_stock]
+        
+        # 使用阶段2已构建的因子，不再重复计算
+        X = factor_data[first_stock]
+        
+        # 计算目标变量
         next_day_data = tick_data.shift(-1)
         next_day_target = next_day_data.between_time(target_time, target_time)
         y = next_day_target['lastprice'] - tick_data['lastprice']
         
-        # 删除无效数据
-        valid_mask = ~(X.isna().any(axis=1) | y.isna())
-        invalid_count = (~valid_mask).sum()
+        # 删除无效数据，直接在numpy数组上计算掩码
+        y = y.reindex(X.index)
+        X_values = X.to_numpy(dtype=np.float64)
+        y_values = y.to_numpy(dtype=np.float64)
+        valid_mask = np.isnan(X_values).any(axis=1)
+        valid_mask |= np.isnan(y_values)
+        np.logical_not(valid_mask, out=valid_mask)
+        invalid_count = X_values.shape[0] - int(valid_mask.sum())
         if invalid_count > 0:
             self.logger.warning(f"发现 {invalid_count} 条无效数据将被删除")
-        X = X[valid_mask]
-        y = y[valid_mask]
+        X = X.iloc[valid_mask]
+        y = y.iloc[valid_mask]
         
         return X, y
     
@@ -228,14 +239,23 @@ class MultiFactorPipeline:
             market_data: 市场数据
         """
         # 获取第一个股票的数据
-        first_stock = list(market_data.keys())[0]
+        first_stock = next(iter(market_data))
         tick_data = market_data[first_stock]
         
-        # 计算市场波动率
-        volatility = tick_data['lastprice'].rolling(20).std().iloc[-1]
+        window = 20
+        prices = tick_data['lastprice'].to_numpy(dtype=np.float64)
+        
+        # 计算市场波动率，只取最后一个窗口，等价于rolling(window).std().iloc[-1]
+        recent = prices[-window:]
+        volatility = recent.std(ddof=1) if len(recent) == window else np.nan
         
-        # 计算市场趋势
-        trend = tick_data['lastprice'].rolling(20).mean().pct_change().iloc[-1]
+        # 计算市场趋势，即最近两个窗口均值的变化率
+        if len(prices) > window:
+            mean_now = prices[-window:].mean()
+            mean_prev = prices[-window - 1:-1].mean()
+            trend = mean_now / mean_prev - 1.0
+        else:
+            trend = np.nan
         
         # 调整预测阈值
         self.predictor.adjust_threshold(volatility, trend)
@@ -1,9 +1,26 @@
 import backtrader as bt
+import logging
+import numpy as np
+import pandas as pd
 from datetime import datetime
+from functools import lru_cache
 from utils.utils import *
+from utils.utils import _OPEN, _CLOSE
 from core.factor_library import *
 from xtquant import xtdata
 
+# 小票池排除的代码前缀：科创板、北交所、ST股票
+_EXCLUDE_PREFIXES = ('688', '43', 'ST', '*ST')
+
+@lru_cache(maxsize=None)
+def _stocks_in_sector(sector):
+    """获取板块内所有股票，结果按板块缓存，每日初始化时清空
+    返回排序后的只读数组，便于按板块整体做向量化成员筛选
+    """
+    stocks = np.unique(np.asarray(xtdata.get_stock_list_in_sector(sector), dtype=str))
+    stocks.flags.writeable = False
+    return stocks
+
 class SectorChaseStrategy(bt.Strategy):
     params = (
         ('big_market_cap', 300e8),
@@ -18,14 +35,16 @@ class SectorChaseStrategy(bt.Strategy):
         ('max_positions', 10),
         ('max_allowed_in_sector', 2),
         ('additional_stock_codes', []),
+        ('avg_turnover_days', 5),
     )
 
     def log(self, txt, dt=None):
         ''' Logging function for this strategy'''
         dt = dt or self.datas[0].datetime.date(0)
-        print('%s, %s' % (dt.isoformat(), txt))
+        self.logger.info('%s, %s', dt.isoformat(), txt)
 
     def __init__(self):
+        self.logger = logging.getLogger(__name__)
         # Keep a reference to the "close" line in the data[0] dataseries
         self.dataclose = self.datas[0].close
         self.order = None
@@ -38,6 +57,17 @@ class SectorChaseStrategy(bt.Strategy):
         self.sectors_of_stocks = get_sectors_of_stocks(instrument_type='stock')
         self.basic_info_df = get_basic_info_df()
         self.current_date = None
+        self._avg_turnover_cache = {}  # 股票平均成交额，每日初始化时批量计算
+        self._base_universe = set()  # 每个bar都需要获取tick的股票
+        self._sector_universe = set()  # 全部板块池成分股，板块被触发时增量更新
+        self._active_sectors = frozenset()  # 上次计算时未淘汰的板块
+        self._active_small_caps = np.array([])  # 未淘汰板块内的小票（去重）
+        self._weights_codes = np.array([])  # 排序后的权重池股票代码
+        self._small_cap_arr = np.array([])  # 排序后的小票池股票代码
+        self._sell_time_t = parse_time(self.p.sell_time)  # 卖出时间，只解析一次
+        self._trading_mask = None  # 按bar索引的交易时段掩码，首个bar时构建
+        self._limit_up_cache = {}  # 股票当日涨停价（已取整到分），每日初始化时清空
+        self._sold_today = False  # 当日是否已执行卖出
 
         # init weights_pool and small_cap_pool
         self._init_daily_data()
@@ -51,10 +81,12 @@ class SectorChaseStrategy(bt.Strategy):
                 self.logger.error("获取基础数据失败，跳过今日交易")
                 return False
 
-            # 构建权重池和小票池
+            # 构建权重池和小票池，整列计算布尔掩码，避免逐行遍历
+            codes = self.basic_info_df['stock_code'].astype(str)
+            is_big = self.basic_info_df['float_amount'] >= self.p.big_market_cap
+
             try:
-                self.weights_pool = {stock_code for stock_code in [index for index, row in self.basic_info_df.iterrows()] 
-                                   if get_float_amount(stock_code) >= self.p.big_market_cap}.union(set(self.p.additional_stock_codes))
+                self.weights_pool = set(codes[is_big]).union(self.p.additional_stock_codes)
                 
                 if not self.weights_pool:
                     self.logger.warning("权重池为空，请检查筛选条件")
@@ -65,15 +97,15 @@ class SectorChaseStrategy(bt.Strategy):
 
             # 构建小票池
             try:
-                self.small_cap_pool = set(
-                    stock_code for index, row in self.basic_info_df.iterrows()
-                    if (get_float_amount(stock_code) < self.p.big_market_cap and  # 流通市值小于300亿
-                        self._get_average_turnover(stock_code) >= self.p.avg_amount   # 平均成交额大于3亿
-                        and not is_kcb(stock_code)  # 排除科创板
-                        and not is_bj(stock_code)  # 排除北交所
-                        and not is_st(stock_code) # 排除ST股票
-                    )
-                )
+                # 一次性批量计算所有股票的平均成交额
+                self._avg_turnover_cache = self._load_avg_turnover(codes.tolist())
+                avg_turnover = codes.map(self._avg_turnover_cache).fillna(0.0)
+                is_excluded = codes.str.startswith(_EXCLUDE_PREFIXES)
+                self.small_cap_pool = set(codes[
+                    ~is_big  # 流通市值小于300亿
+                    & (avg_turnover >= self.p.avg_amount)  # 平均成交额大于3亿
+                    & ~is_excluded
+                ])
                 
                 if not self.small_cap_pool:
                     self.logger.warning("小票池为空，请检查筛选条件")
@@ -82,8 +114,22 @@ class SectorChaseStrategy(bt.Strategy):
                 self.logger.error(f"构建小票池时发生错误: {str(e)}")
                 return False
 
-            # 清空其他池
+            # 权重池排序后固定顺序，供每个bar向量化计算涨幅
+            self._weights_codes = np.array(sorted(self.weights_pool))
+            # 小票池转为排序数组，供板块成分股整体求交集
+            self._small_cap_arr = np.array(sorted(self.small_cap_pool))
+
+            # 权重池和小票池在当日内不变，预先合并供每个bar获取tick使用
+            self._base_universe = self.weights_pool | self.small_cap_pool
+
+            # 清空其他池及板块成分股缓存
+            _stocks_in_sector.cache_clear()
+            self._limit_up_cache.clear()
+            self._sold_today = False
             self.sector_pools.clear()
+            self._sector_universe.clear()
+            self._active_sectors = frozenset()
+            self._active_small_caps = np.array([])
             self.prepare_pool.clear()
             self.limit_up_sections.clear()
             self.triggered_weights.clear()
@@ -95,84 +141,121 @@ class SectorChaseStrategy(bt.Strategy):
             self.logger.error(f"数据初始化过程中发生错误: {str(e)}")
             return False
 
+    def _load_avg_turnover(self, stock_list):
+        """批量获取股票最近avg_turnover_days个交易日的平均成交额
+        :param stock_list: 股票代码列表
+        :return: dict, key为股票代码,value为平均成交额
+        """
+        amount = xtdata.get_market_data(
+            field_list=['amount'],
+            stock_list=stock_list,
+            period='1d',
+            count=self.p.avg_turnover_days
+        )['amount']
+        return amount.mean(axis=1).to_dict()
+
     def _get_average_turnover(self, stock_code):
-        #TODO: 实现获取平均成交额的函数
-        return 3e8
+        """获取股票平均成交额（读取当日缓存）"""
+        return self._avg_turnover_cache.get(stock_code, 0.0)
 
-    def _update_sector_pools(self):
+    def _calc_change_rates(self, tick_data):
+        """遍历一次tick快照，向量化计算全部股票的涨幅，供各步骤共用
+        :param tick_data: 本bar的tick快照
+        :return: pd.Series, index为股票代码, value为涨幅，昨收无效时为NaN
+        """
+        n = len(tick_data)
+        last = np.empty(n)
+        preclose = np.empty(n)
+        # 字段缺失或格式异常的tick只得到NaN涨幅，不影响其他股票
+        for i, tick in enumerate(tick_data.values()):
+            try:
+                last[i] = tick.get('lastPrice', np.nan)
+                preclose[i] = tick.get('preClose', np.nan)
+            except (AttributeError, TypeError, ValueError):
+                last[i] = preclose[i] = np.nan
+        # 原地相减再相除，不产生中间数组
+        change_rates = np.full(n, np.nan)
+        np.subtract(last, preclose, out=last)
+        np.divide(last, preclose, out=change_rates, where=preclose > 0)
+        return pd.Series(change_rates, index=list(tick_data))
+
+    def _limit_up_price(self, stock_code, tick_info):
+        """获取股票当日涨停价，盘中不变，首次读取后按日缓存
+        :param stock_code: 股票代码
+        :param tick_info: 该股票的tick数据
+        :return: 取整到分的涨停价
+        """
+        limit_up_price = self._limit_up_cache.get(stock_code)
+        if limit_up_price is None:
+            limit_up_price = self._limit_up_cache[stock_code] = round(tick_info['highLimit'], 2)
+        return limit_up_price
+
+    def _is_limit_up(self, stock_code, tick_info):
+        """判断股票当前是否涨停
+        :param stock_code: 股票代码
+        :param tick_info: 该股票的tick数据
+        :return: bool
+        """
+        return round(tick_info['lastPrice'], 2) >= self._limit_up_price(stock_code, tick_info)
+
+    def _update_sector_pools(self, tick_data, change_rates):
         """更新板块池（策略步骤2实现）
         根据权重池股票涨幅超过3%的情况，建立或更新板块池
+        :param tick_data: 本bar的tick快照
+        :param change_rates: 本bar全部股票的涨幅
         """
         try:
-            # 获取当前所有股票的tick数据
-            tick_data = {}
-            for stock_code in self.weights_pool:
-                try:
-                    tick = xtdata.get_full_tick([stock_code])
-                    if stock_code in tick:
-                        tick_data[stock_code] = tick[stock_code]
-                except Exception as e:
-                    self.logger.error(f"获取股票 {stock_code} 的tick数据失败: {str(e)}")
-                    continue
+            weight_rates = change_rates.reindex(self._weights_codes)
 
-            # 记录涨幅超过3%的权重股票及其板块
-            for stock_code in self.weights_pool:
+            # 记录涨幅超过3%的权重股票及其板块，只逐只处理达到阈值的股票
+            for stock_code, change_rate in weight_rates[weight_rates >= self.p.weight_gain].items():
                 if stock_code in self.triggered_weights:
                     continue
-                    
-                if stock_code not in tick_data:
-                    continue
-                    
                 try:
-                    # 计算涨幅
-                    current_price = tick_data[stock_code]['lastPrice']
-                    preclose = tick_data[stock_code]['preClose']
-                    change_rate = (current_price - preclose) / preclose
-
-                    if change_rate >= self.p.weight_gain:
-                        # 获取股票所属板块
-                        if stock_code not in self.sectors_of_stocks:
-                            self.logger.warning(f"股票 {stock_code} 没有板块信息")
-                            continue
-                            
-                        sectors = self.sectors_of_stocks[stock_code]
-                        if not sectors:
-                            self.logger.warning(f"股票 {stock_code} 的板块列表为空")
-                            continue
+                    # 获取股票所属板块
+                    if stock_code not in self.sectors_of_stocks:
+                        self.logger.warning(f"股票 {stock_code} 没有板块信息")
+                        continue
+                        
+                    sectors = self.sectors_of_stocks[stock_code]
+                    if not sectors:
+                        self.logger.warning(f"股票 {stock_code} 的板块列表为空")
+                        continue
 
-                        # 更新板块池
-                        for sector in sectors:
-                            try:
-                                # 获取板块内所有股票
-                                sector_stocks = xtdata.get_stock_list_in_sector(sector)
-                                if not sector_stocks:
-                                    self.logger.warning(f"板块 {sector} 没有股票")
-                                    continue
-
-                                if sector not in self.sector_pools:
-                                    self.sector_pools[sector] = {
-                                        'stocks': sector_stocks,
-                                        'trigger_stocks': [stock_code],
-                                        'limit_ups': 0,
-                                        'eliminated': False,
-                                        'last_update': datetime.now()
-                                    }
-                                else:
-                                    # 更新触发股票列表
-                                    if stock_code not in self.sector_pools[sector]['trigger_stocks']:
-                                        self.sector_pools[sector]['trigger_stocks'].append(stock_code)
-                                    
-                                    # 更新股票列表（以防板块成分股发生变化）
-                                    self.sector_pools[sector]['stocks'] = sector_stocks
-                                    self.sector_pools[sector]['last_update'] = datetime.now()
+                    # 更新板块池
+                    for sector in sectors:
+                        try:
+                            # 获取板块内所有股票
+                            sector_stocks = _stocks_in_sector(sector)
+                            if len(sector_stocks) == 0:
+                                self.logger.warning(f"板块 {sector} 没有股票")
+                                continue
 
-                                self.logger.info(f"板块 {sector} 被触发，触发股票: {stock_code}, 涨幅: {change_rate:.2%}")
+                            if sector not in self.sector_pools:
+                                self._sector_universe.update(sector_stocks)
+                                self.sector_pools[sector] = {
+                                    'stocks': sector_stocks,
+                                    'trigger_stocks': [stock_code],
+                                    'limit_ups': 0,
+                                    'eliminated': False,
+                                    'last_update': datetime.now()
+                                }
+                            else:
+                                # 更新触发股票列表
+                                if stock_code not in self.sector_pools[sector]['trigger_stocks']:
+                                    self.sector_pools[sector]['trigger_stocks'].append(stock_code)
                                 
-                            except Exception as e:
-                                self.logger.error(f"处理板块 {sector} 时发生错误: {str(e)}")
-                                continue
+                                # 更新股票列表（以防板块成分股发生变化）
+                                self.sector_pools[sector]['stocks'] = sector_stocks
+                                self.sector_pools[sector]['last_update'] = datetime.now()
 
-                        self.triggered_weights.add(stock_code)
+                            self.logger.info(f"板块 {sector} 被触发，触发股票: {stock_code}, 涨幅: {change_rate:.2%}")
+                            
+                        except Exception as e:
+                            self.logger.error(f"处理板块 {sector} 时发生错误: {str(e)}")
+                            continue
+
+                    self.triggered_weights.add(stock_code)
                         
                 except Exception as e:
                     self.logger.error(f"处理股票 {stock_code} 时发生错误: {str(e)}")
@@ -185,8 +268,11 @@ class SectorChaseStrategy(bt.Strategy):
                     if 'stocks' in self.sector_pools[sector]:
                         for stock_code in self.sector_pools[sector]['stocks']:
                             if stock_code in tick_data:
-                                if self._is_limit_up(stock_code, tick_data[stock_code]['lastPrice']):
+                                if self._is_limit_up(stock_code, tick_data[stock_code]):
                                     limit_ups += 1
+                                    # 达到上限即可判定淘汰，无需继续统计
+                                    if limit_ups >= self.p.max_allowed_in_sector:
+                                        break
                     
                     self.sector_pools[sector]['limit_ups'] = limit_ups
                     
@@ -205,78 +291,43 @@ class SectorChaseStrategy(bt.Strategy):
             self.logger.error(f"更新板块池时发生错误: {str(e)}")
             # 发生错误时，清空板块池
             self.sector_pools.clear()
+            self._sector_universe.clear()
 
-    def _update_prepare_pool(self):
+    def _update_prepare_pool(self, tick_data, change_rates):
         """更新待打池（策略步骤3+4实现）
         步骤3：筛选符合条件的小票
         步骤4：根据成交额筛选
+        :param tick_data: 本bar的tick快照
+        :param change_rates: 本bar全部股票的涨幅
         """
         try:
-            # 获取所有相关股票的tick数据
-            tick_data = {}
-            all_stocks = set()
-            for sector, pool in self.sector_pools.items():
-                if pool.get('eliminated', True):
-                    continue
-                all_stocks.update(pool.get('stocks', []))
-            
-            if not all_stocks:
-                return
-                
-            try:
-                tick_data = xtdata.get_full_tick(list(all_stocks))
-            except Exception as e:
-                self.logger.error(f"获取tick数据失败: {str(e)}")
+            # 没有未淘汰的板块时无需处理
+            if all(pool.get('eliminated', True) for pool in self.sector_pools.values()):
                 return
 
-            # 步骤3：筛选符合条件的小票
-            for sector, pool in self.sector_pools.items():
-                if pool.get('eliminated', True):
-                    continue
-                    
-                for stock_code in pool.get('stocks', []):
-                    # 仅处理小票池中的股票
-                    if stock_code not in self.small_cap_pool:
-                        continue
-                        
-                    if stock_code not in tick_data:
-                        continue
-                        
-                    try:
-                        # 计算涨幅
-                        current_price = tick_data[stock_code]['lastPrice']
-                        preclose = tick_data[stock_code]['preClose']
-                        change_rate = (current_price - preclose) / preclose
-
-                        # 涨幅超过8%且属于小票池
-                        if change_rate >= self.p.sector_gain:
-                            self.prepare_pool.add(stock_code)
-                            self.logger.info(f"股票 {stock_code} 进入待打池，涨幅: {change_rate:.2%}")
-                    except Exception as e:
-                        self.logger.error(f"处理股票 {stock_code} 时发生错误: {str(e)}")
-                        continue
+            # 步骤3：筛选符合条件的小票，多个板块共有的股票只处理一次
+            sector_rates = change_rates.reindex(self._get_active_small_caps())
+
+            # 涨幅超过8%且属于小票池
+            for stock_code, change_rate in sector_rates[sector_rates >= self.p.sector_gain].items():
+                self.prepare_pool.add(stock_code)
+                self.logger.info(f"股票 {stock_code} 进入待打池，涨幅: {change_rate:.2%}")
 
             # 步骤4：成交额筛选
+            # 单tick成交额与当日累计成交额均取自tick的amount字段，一次性构造布尔掩码
+            candidates = [stock_code for stock_code in self.prepare_pool if stock_code in tick_data]
+            amounts = np.fromiter((tick_data[stock_code].get('amount', 0) for stock_code in candidates),
+                                  dtype=np.float64, count=len(candidates))
+            passed = (amounts >= self.p.tick_amount) | (amounts >= self.p.daily_amount)
+
             final_pool = set()
-            for stock_code in self.prepare_pool:
-                if stock_code not in tick_data:
-                    continue
-                    
+            for i in np.flatnonzero(passed):
+                stock_code = candidates[i]
                 try:
-                    tick_info = tick_data[stock_code]
-                    # 单tick成交额
-                    tick_amount = tick_info['amount']
-                    # 当日累计成交额
-                    daily_amount = tick_info['amount']
-                    
-                    # 检查成交额条件
-                    if (tick_amount >= self.p.tick_amount or 
-                        daily_amount >= self.p.daily_amount):
-                        
-                        # 检查是否涨停
-                        if self._is_limit_up(stock_code, tick_info['lastPrice']):
-                            final_pool.add(stock_code)
-                            self.logger.info(f"股票 {stock_code} 进入准备下单池，tick成交额: {tick_amount:.2f}万, 日成交额: {daily_amount:.2f}万")
+                    # 检查是否涨停
+                    if self._is_limit_up(stock_code, tick_data[stock_code]):
+                        final_pool.add(stock_code)
+                        self.logger.info(f"股票 {stock_code} 进入准备下单池，tick成交额: {amounts[i]:.2f}万, 日成交额: {amounts[i]:.2f}万")
                             
                 except Exception as e:
                     self.logger.error(f"处理股票 {stock_code} 成交额时发生错误: {str(e)}")
@@ -293,9 +344,65 @@ class SectorChaseStrategy(bt.Strategy):
             # 发生错误时，清空准备下单池
             self.prepare_pool.clear()
 
+    def _get_active_small_caps(self):
+        """未淘汰板块内的全部小票（去重），仅在未淘汰板块集合变化时重新计算
+        :return: 排序后的股票代码数组
+        """
+        active = frozenset(sector for sector, pool in self.sector_pools.items()
+                           if not pool.get('eliminated', True))
+        if active != self._active_sectors:
+            self._active_sectors = active
+            if active:
+                stocks = np.concatenate([self.sector_pools[sector]['stocks'] for sector in active])
+                self._active_small_caps = np.intersect1d(stocks, self._small_cap_arr)
+            else:
+                self._active_small_caps = np.array([])
+        return self._active_small_caps
+
+    def _tick_universe(self):
+        """本bar需要关注的全部股票：权重池、小票池及各板块池成分股"""
+        return self._base_universe | self._sector_universe
+
+    def _snapshot_ticks(self, stock_list):
+        """批量获取tick快照，一次请求代替逐只获取
+        :param stock_list: 股票代码集合
+        :return: dict, key为股票代码,value为tick数据
+        """
+        if not stock_list:
+            return {}
+        try:
+            return xtdata.get_full_tick(list(stock_list))
+        except Exception as e:
+            self.logger.error(f"获取tick数据失败: {str(e)}")
+            return {}
+
+    def _is_trading_bar(self, current_time):
+        """判断当前bar是否在交易时间内
+        数据预加载后按整列时间一次性计算交易时段掩码，之后每个bar只需按索引取值
+        :param current_time: 当前bar的时间，掩码未覆盖当前bar时回退到逐bar判断
+        :return: bool
+        """
+        if self._trading_mask is None:
+            # backtrader以天为单位的浮点数存储时间，小数部分即当日时间
+            # 按毫秒比较，不取整到秒，与is_trading_time的判断保持一致；
+            # 容差0.1毫秒只用于吸收浮点误差（约数微秒），小于tick时间戳的毫秒精度
+            dt_arr = np.asarray(self.datas[0].datetime.array, dtype=np.float64)
+            ms = (dt_arr % 1.0) * 86400000.0
+            eps = 0.1
+            open_ms = (_OPEN.hour * 3600 + _OPEN.minute * 60 + _OPEN.second) * 1000.0
+            close_ms = (_CLOSE.hour * 3600 + _CLOSE.minute * 60 + _CLOSE.second) * 1000.0
+            self._trading_mask = (ms >= open_ms - eps) & (ms <= close_ms + eps)
+
+        idx = len(self.datas[0]) - 1
+        if idx < len(self._trading_mask):
+            return bool(self._trading_mask[idx])
+        return is_trading_time(current_time)
+
     def next(self):
-        current_time = self.datas[0].datetime.time()
-        current_date = self.datas[0].datetime.date()
+        # 只做一次浮点时间到datetime的转换
+        dt = self.datas[0].datetime.datetime(0)
+        current_time = dt.time()
+        current_date = dt.date()
         
         # 检查是否需要初始化数据
         if self.current_date != current_date:
@@ -305,22 +412,27 @@ class SectorChaseStrategy(bt.Strategy):
             self.current_date = current_date
             
         # 检查是否在交易时间内
-        if not is_trading_time(current_time):
+        if not self._is_trading_bar(current_time):
             return
             
         try:
+            # 一次性获取本bar所需的全部tick数据
+            tick_data = self._snapshot_ticks(self._tick_universe())
+            # 涨幅只计算一次，板块池和待打池共用
+            change_rates = self._calc_change_rates(tick_data)
+            
             # 更新板块池
-            self._update_sector_pools()
+            self._update_sector_pools(tick_data, change_rates)
             
             # 更新待打池
-            self._update_prepare_pool()
+            self._update_prepare_pool(tick_data, change_rates)
             
             # 执行交易
-            self._execute_orders()
+            self._execute_orders(tick_data)
             
-            # 检查是否需要卖出
-            if current_time >= parse_time(self.p.sell_time):
-                self._sell_positions()
+            # 检查是否需要卖出，每日成功执行一次，失败时下一个bar重试
+            if current_time >= self._sell_time_t and not self._sold_today:
+                self._sold_today = self._sell_positions()
                 
         except Exception as e:
             self.logger.error(f"策略执行过程中发生错误: {str(e)}")
@@ -385,11 +497,12 @@ class SectorChaseStrategy(bt.Strategy):
         # Write down: no pending order
         self.order = None
 
-    def _execute_orders(self):
+    def _execute_orders(self, tick_data):
         """执行交易（策略步骤5实现）
         1. 检查是否达到最大板块数量限制
         2. 检查是否达到最大持仓数量限制
         3. 执行买入订单
+        :param tick_data: 本bar的tick快照
         """
         try:
             # 检查是否达到最大板块数量限制
@@ -398,40 +511,35 @@ class SectorChaseStrategy(bt.Strategy):
                 return
 
             # 检查是否达到最大持仓数量限制
-            current_positions = len(self.broker.get_positions())
-            if current_positions >= self.p.max_positions:
+            # 持仓数量只查询一次，买入后在本地累加
+            n_positions = len(self.broker.get_positions())
+            if n_positions >= self.p.max_positions:
                 self.logger.info(f"已达到最大持仓数量限制: {self.p.max_positions}")
                 return
 
-            # 获取所有相关股票的tick数据
             if not self.prepare_pool:
                 return
-                
-            try:
-                tick_data = xtdata.get_full_tick(list(self.prepare_pool))
-            except Exception as e:
-                self.logger.error(f"获取tick数据失败: {str(e)}")
-                return
 
             # 执行买入订单
             for stock_code in self.prepare_pool:
+                if n_positions >= self.p.max_positions:
+                    self.logger.info(f"已达到最大持仓数量限制: {self.p.max_positions}")
+                    break
+
                 if stock_code not in tick_data:
                     continue
                     
                 try:
-                    tick_info = tick_data[stock_code]
-                    current_price = tick_info['lastPrice']
-                    limit_up_price = tick_info['highLimit']
-                    
                     # 检查是否涨停
-                    if current_price >= limit_up_price:
+                    if self._is_limit_up(stock_code, tick_data[stock_code]):
                         # 计算可买数量
-                        buy_price = int(limit_up_price * 100) / 100  # 涨停价向下取整到分
+                        buy_price = self._limit_up_price(stock_code, tick_data[stock_code])
                         size = int(self.p.order_amount // buy_price)
                         
                         if size > 0:
                             # 执行买入订单
                             self._buy_stock(stock_code, amount=self.p.order_amount)
+                            n_positions += 1
                             
                             # 记录板块信息
                             for sector, pool in self.sector_pools.items():
@@ -450,14 +558,15 @@ class SectorChaseStrategy(bt.Strategy):
     def _sell_positions(self):
         """次日卖出（策略步骤7实现）
         1. 获取所有持仓
-        2. 获取当前行情数据
+        2. 获取当前行情数据（仅用于记录日志，获取失败不影响卖出）
         3. 执行卖出订单
+        :return: bool, 是否所有持仓都已提交卖出（无持仓也视为完成），未完成时需要后续重试
         """
         try:
             # 获取所有持仓
             positions = self.broker.get_positions()
             if not positions:
-                return
+                return True
                 
             # 获取所有持仓股票的tick数据
             stock_list = [pos.data._name for pos in positions]
@@ -465,41 +574,47 @@ class SectorChaseStrategy(bt.Strategy):
                 tick_data = xtdata.get_full_tick(stock_list)
             except Exception as e:
                 self.logger.error(f"获取tick数据失败: {str(e)}")
-                return
+                tick_data = {}
 
-            # 执行卖出订单
+            # 执行卖出订单，记录是否有持仓未能提交卖出
+            all_submitted = True
             for position in positions:
                 stock_code = position.data._name
-                if stock_code not in tick_data:
-                    continue
-                    
                 try:
-                    # 获取当前价格
-                    current_price = tick_data[stock_code]['lastPrice']
-                    
                     # 计算卖出数量
                     size = position.size
                     
                     if size > 0:
                         # 执行卖出订单
                         self._sell_stock(stock_code, proportion=1.0)
+                        current_price = tick_data.get(stock_code, {}).get('lastPrice', float('nan'))
                         self.logger.info(f"卖出股票 {stock_code}，价格: {current_price:.2f}，数量: {size}")
                         
                 except Exception as e:
                     self.logger.error(f"处理股票 {stock_code} 卖出时发生错误: {str(e)}")
+                    all_submitted = False
                     continue
 
+            if not all_submitted:
+                self.logger.warning("部分持仓卖出失败，将在下一个bar重试")
+                return False
+
             # 清空相关池
             self.prepare_pool.clear()
             self.limit_up_sections.clear()
             self.triggered_weights.clear()
             
             self.logger.info("所有持仓已清空")
+            return True
             
         except Exception as e:
             self.logger.error(f"执行卖出时发生错误: {str(e)}")
+            return False
 
 if __name__ == '__main__':
+    # 策略日志输出到控制台和strategy.log
+    setup_logger(__name__)
+
     # Create a cerebro entity
     cerebro = bt.Cerebro()
 
@@ -516,21 +631,24 @@ if __name__ == '__main__':
         start_time=start_date,
         end_time=end_date,
         period='tick',
-        field_list=['lastPrice', 'volume', 'amount']
+        field_list=['time', 'lastPrice', 'volume', 'amount']
     )
     print(stocks_data)
-    for stock_code, df in stocks_data:
+    for stock_code, df in stocks_data.items():
+        # 毫秒时间戳整列向量化转换为北京时间，作为数据源的时间索引
+        df.index = (pd.to_datetime(df['time'], unit='ms', utc=True)
+                    .dt.tz_convert('Asia/Shanghai')
+                    .dt.tz_localize(None))
 
-        # 通过xtdata获取每只股票的历史数据        
         # 创建每只股票的数据源
         data = bt.feeds.PandasData(
             dataname=df,
-            datetime=0,
+            datetime=None,
             open=-1,
             high=-1,
             low=-1,
-            close=1,
-            volume=2,
+            close='lastPrice',
+            volume='volume',
             openinterest=-1
         )
         
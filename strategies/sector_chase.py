@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 from datetime import datetime
 from core.strategy import Strategy
 from core.data_feed import DataFeed
@@ -13,12 +14,22 @@ class SectorChaseStrategy(Strategy):
         self.current_stock = None
         self.last_sector_change = None
         self.sector_change_interval = 5  # 板块切换间隔（天）
+        self._today_date = None
+        self._today_str = None
+        
+    def _today(self):
+        """获取当前日期及其yyyymmdd格式字符串，仅在跨日时重新格式化"""
+        today = datetime.now().date()
+        if today != self._today_date:
+            self._today_date = today
+            self._today_str = today.strftime('%Y%m%d')
+        return self._today_str, self._today_date
         
     def on_data(self):
         """处理每个数据点的逻辑"""
         try:
             # 获取当前日期
-            current_date = datetime.now().date()
+            _, current_date = self._today()
             
             # 检查是否需要切换板块
             if (self.last_sector_change is None or 
@@ -35,32 +46,46 @@ class SectorChaseStrategy(Strategy):
     def _change_sector(self):
         """切换板块"""
         try:
-            # 获取所有板块
-            sectors = self.data_feed._get_sector_info().keys()
-            if not sectors:
+            # 获取所有板块及其成分股
+            sector_info = self.data_feed._get_sector_info()
+            if not sector_info:
                 logging.error("获取板块列表失败")
                 return
                 
-            # 选择成交额最大的板块
-            max_turnover = 0
-            best_sector = None
-            
-            for sector in sectors:
-                stocks = self.data_feed.get_sector_stocks(sector)
+            # 展开为(板块编号, 股票)对，板块内的股票去重
+            sector_names = []
+            sector_ids = []
+            sector_stocks = []
+            for sector, stocks in sector_info.items():
                 if not stocks:
                     continue
-                    
-                # 计算板块平均成交额
-                turnovers = self.data_feed.get_batch_turnover(stocks)
-                avg_turnover = sum(turnovers.values()) / len(turnovers)
-                
-                if avg_turnover > max_turnover:
-                    max_turnover = avg_turnover
-                    best_sector = sector
+                unique_stocks = list(dict.fromkeys(stocks))
+                sector_ids.extend([len(sector_names)] * len(unique_stocks))
+                sector_stocks.extend(unique_stocks)
+                sector_names.append(sector)
+            
+            if not sector_names:
+                return
+            
+            # 一次性获取所有股票的成交额
+            turnovers = self.data_feed.get_batch_turnover(list(dict.fromkeys(sector_stocks)))
+            values = np.fromiter((turnovers[stock] for stock in sector_stocks),
+                                 dtype=np.float64, count=len(sector_stocks))
+            # 成交额缺失（NaN）的股票按0计入，避免整个板块的均值变为NaN
+            np.nan_to_num(values, copy=False, nan=0.0)
+            
+            # 按板块汇总，计算板块平均成交额，选择成交额最大的板块
+            sector_ids = np.asarray(sector_ids)
+            sums = np.bincount(sector_ids, weights=values, minlength=len(sector_names))
+            counts = np.bincount(sector_ids, minlength=len(sector_names))
+            avg_turnovers = sums / counts
+            
+            best_idx = int(np.argmax(avg_turnovers))
+            best_sector = sector_names[best_idx] if avg_turnovers[best_idx] > 0 else None
             
             if best_sector:
                 self.current_sector = best_sector
-                self.last_sector_change = datetime.now().date()
+                _, self.last_sector_change = self._today()
                 logging.info(f"切换到板块: {best_sector}")
                 
                 # 清空当前持仓
@@ -83,14 +108,16 @@ class SectorChaseStrategy(Strategy):
             # 获取所有股票的成交额
             turnovers = self.data_feed.get_batch_turnover(stocks)
             
+            if not turnovers:
+                return
+                
             # 选择成交额最大的股票
-            max_turnover = 0
-            best_stock = None
-            
-            for stock, turnover in turnovers.items():
-                if turnover > max_turnover:
-                    max_turnover = turnover
-                    best_stock = stock
+            codes = list(turnovers.keys())
+            values = np.fromiter(turnovers.values(), dtype=np.float64, count=len(codes))
+            # 成交额缺失（NaN）的股票视为0，不参与最大值选择
+            np.nan_to_num(values, copy=False, nan=0.0)
+            best_idx = int(np.argmax(values))
+            best_stock = codes[best_idx] if values[best_idx] > 0 else None
             
             if best_stock:
                 self.current_stock = best_stock
@@ -103,10 +130,11 @@ class SectorChaseStrategy(Strategy):
         """买入股票"""
         try:
             # 获取当前价格
+            today_str, _ = self._today()
             data = self.data_feed.get_market_data(
                 stock_list=[stock_code],
-                start_date=datetime.now().strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d'),
+                start_date=today_str,
+                end_date=today_str,
                 period='tick'
             )
             
@@ -140,10 +168,11 @@ class SectorChaseStrategy(Strategy):
                 return
                 
             # 获取当前价格
+            today_str, _ = self._today()
             data = self.data_feed.get_market_data(
                 stock_list=[self.current_stock],
-                start_date=datetime.now().strftime('%Y%m%d'),
-                end_date=datetime.now().strftime('%Y%m%d'),
+                start_date=today_str,
+                end_date=today_str,
                 period='tick'
             )
             
@@ -2,62 +2,93 @@
 from xtquant.xttrader import XtQuantTrader, XtQuantTraderCallback
 from xtquant.xttype import StockAccount
 from xtquant import xtconstant
+import logging
+from utils.utils import setup_logger
+from collections import deque
+
+logger = logging.getLogger(__name__)
 
 
 class MyXtQuantTraderCallback(XtQuantTraderCallback):
+    def __init__(self, maxlen=10000):
+        """
+        :param maxlen: 每个回报队列保留的最大条数，未及时取出时丢弃最早的回报，避免内存无限增长
+        """
+        super().__init__()
+        # 回调运行在交易接口的线程中，只把回报放入队列，由策略线程取出处理
+        # deque的append/popleft是线程安全的，无需额外加锁
+        self.order_q = deque(maxlen=maxlen)
+        self.trade_q = deque(maxlen=maxlen)
+        self.async_response_q = deque(maxlen=maxlen)
+        # 各队列因溢出丢弃的回报条数
+        self.dropped = {'order': 0, 'trade': 0, 'async_response': 0}
+
+    def _publish(self, q, name, item):
+        """
+        回报入队，队列已满时最早的回报会被丢弃，记录丢弃数量并告警
+        :param q: 回报队列
+        :param name: 队列名称，对应dropped中的key
+        :param item: 回报内容
+        :return:
+        """
+        if len(q) == q.maxlen:
+            self.dropped[name] += 1
+            logger.warning("%s回报队列已满(%d)，丢弃最早的回报，累计丢弃 %d 条", name, q.maxlen, self.dropped[name])
+        q.append(item)
+
     def on_disconnected(self):
         """
         连接断开
         :return:
         """
-        print("connection lost")
+        logger.error("connection lost")
     def on_stock_order(self, order):
         """
         委托回报推送
         :param order: XtOrder对象
         :return:
         """
-        print("on order callback:")
-        print(order.stock_code, order.order_status, order.order_sysid)
+        self._publish(self.order_q, 'order', (order.stock_code, order.order_status, order.order_sysid))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("on order callback: %s %s %s", order.stock_code, order.order_status, order.order_sysid)
     def on_stock_trade(self, trade):
         """
         成交变动推送
         :param trade: XtTrade对象
         :return:
         """
-        print("on trade callback")
-        print(trade.account_id, trade.stock_code, trade.order_id)
+        self._publish(self.trade_q, 'trade', (trade.stock_code, trade.order_id, trade.traded_volume, trade.traded_price))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("on trade callback: %s %s %s", trade.account_id, trade.stock_code, trade.order_id)
     def on_order_error(self, order_error):
         """
         委托失败推送
         :param order_error:XtOrderError 对象
         :return:
         """
-        print("on order_error callback")
-        print(order_error.order_id, order_error.error_id, order_error.error_msg)
+        logger.error("on order_error callback: %s %s %s", order_error.order_id, order_error.error_id, order_error.error_msg)
     def on_cancel_error(self, cancel_error):
         """
         撤单失败推送
         :param cancel_error: XtCancelError 对象
         :return:
         """
-        print("on cancel_error callback")
-        print(cancel_error.order_id, cancel_error.error_id, cancel_error.error_msg)
+        logger.error("on cancel_error callback: %s %s %s", cancel_error.order_id, cancel_error.error_id, cancel_error.error_msg)
     def on_order_stock_async_response(self, response):
         """
         异步下单回报推送
         :param response: XtOrderResponse 对象
         :return:
         """
-        print("on_order_stock_async_response")
-        print(response.account_id, response.order_id, response.seq)
+        self._publish(self.async_response_q, 'async_response', (response.seq, response.order_id))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("on_order_stock_async_response: %s %s %s", response.account_id, response.order_id, response.seq)
     def on_account_status(self, status):
         """
         :param response: XtAccountStatus 对象
         :return:
         """
-        print("on_account_status")
-        print(status.account_id, status.account_type, status.status)
+        logger.info("on_account_status: %s %s %s", status.account_id, status.account_type, status.status)
 
 class QmtTrade:
     def __init__(self, path, session_id, account_id):
@@ -70,83 +101,115 @@ class QmtTrade:
         self.xt_trader.register_callback(self.callback)
         self.xt_trader.start()
         self.connect_result = self.xt_trader.connect()
-        print(self.connect_result)
+        logger.info("connect result: %s", self.connect_result)
         self.subscribe_result = self.xt_trader.subscribe(self.acc)
-        print(self.subscribe_result)
+        logger.info("subscribe result: %s", self.subscribe_result)
 
     def order_stock(self, stock_code, volume, price_type, price, strategy_name, remark):
-        print("order using the fix price:")
         fix_result_order_id = self.xt_trader.order_stock(self.acc, stock_code, xtconstant.STOCK_BUY, volume, price_type, price, strategy_name, remark)
-        print(fix_result_order_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("order using the fix price: %s", fix_result_order_id)
         return fix_result_order_id
 
     def cancel_order(self, order_id):
-        print("cancel order:")
         cancel_order_result = self.xt_trader.cancel_order_stock(self.acc, order_id)
-        print(cancel_order_result)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("cancel order: %s", cancel_order_result)
         return cancel_order_result
 
     def order_stock_async(self, stock_code, volume, price_type, price, strategy_name, remark):
-        print("order using async api:")
         async_seq = self.xt_trader.order_stock_async(self.acc, stock_code, xtconstant.STOCK_BUY, volume, price_type, price, strategy_name, remark)
-        print(async_seq)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("order using async api: %s", async_seq)
         return async_seq
 
+    def submit_batch(self, orders):
+        """
+        批量异步下单，逐笔提交后立即返回，不等待柜台确认
+        :param orders: list of (stock_code, volume, price_type, price, strategy_name, remark)
+        :return: list, 与orders一一对应的下单请求序号seq，可通过drain_async_responses获取对应的订单编号
+        """
+        return [self.order_stock_async(*order) for order in orders]
+
     def query_asset(self):
-        print("query asset:")
         asset = self.xt_trader.query_stock_asset(self.acc)
-        if asset:
-            print("asset:")
-            print("cash {0}".format(asset.cash))
+        if asset and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query asset: cash %s", asset.cash)
         return asset
 
     def query_order(self, order_id):
-        print("query order:")
         order = self.xt_trader.query_stock_order(self.acc, order_id)
-        if order:
-            print("order:")
-            print("order {0}".format(order.order_id))
+        if order and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query order: order %s", order.order_id)
         return order
 
     def query_orders(self):
-        print("query orders:")
         orders = self.xt_trader.query_stock_orders(self.acc)
-        print("orders:", len(orders))
-        if len(orders) != 0:
-            print("last order:")
-            print("{0} {1} {2}".format(orders[-1].stock_code, orders[-1].order_volume, orders[-1].price))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query orders: %d", len(orders))
+            if len(orders) != 0:
+                logger.debug("last order: %s %s %s", orders[-1].stock_code, orders[-1].order_volume, orders[-1].price)
         return orders
 
     def query_trades(self):
-        print("query trade:")
         trades = self.xt_trader.query_stock_trades(self.acc)
-        print("trades:", len(trades))
-        if len(trades) != 0:
-            print("last trade:")
-            print("{0} {1} {2}".format(trades[-1].stock_code, trades[-1].traded_volume, trades[-1].traded_price))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query trades: %d", len(trades))
+            if len(trades) != 0:
+                logger.debug("last trade: %s %s %s", trades[-1].stock_code, trades[-1].traded_volume, trades[-1].traded_price)
         return trades
 
     def query_positions(self):
-        print("query positions:")
         positions = self.xt_trader.query_stock_positions(self.acc)
-        print("positions:", len(positions))
-        if len(positions) != 0:
-            print("last position:")
-            print("{0} {1} {2}".format(positions[-1].account_id, positions[-1].stock_code, positions[-1].volume))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query positions: %d", len(positions))
+            if len(positions) != 0:
+                logger.debug("last position: %s %s %s", positions[-1].account_id, positions[-1].stock_code, positions[-1].volume)
         return positions
 
     def query_position(self, stock_code):
-        print("query position:")
         position = self.xt_trader.query_stock_position(self.acc, stock_code)
-        if position:
-            print("position:")
-            print("{0} {1} {2}".format(position.account_id, position.stock_code, position.volume))
+        if position and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("query position: %s %s %s", position.account_id, position.stock_code, position.volume)
         return position
 
+    @staticmethod
+    def _drain(q):
+        """非阻塞地取出队列中当前全部元素"""
+        items = []
+        while True:
+            try:
+                items.append(q.popleft())
+            except IndexError:
+                return items
+
+    def drain_orders(self):
+        """
+        取出回调推送的全部委托回报
+        :return: list of (stock_code, order_status, order_sysid)
+        """
+        return self._drain(self.callback.order_q)
+
+    def drain_trades(self):
+        """
+        取出回调推送的全部成交回报
+        :return: list of (stock_code, order_id, traded_volume, traded_price)
+        """
+        return self._drain(self.callback.trade_q)
+
+    def drain_async_responses(self):
+        """
+        取出回调推送的全部异步下单回报
+        :return: dict, key为下单请求序号seq,value为订单编号
+        """
+        return dict(self._drain(self.callback.async_response_q))
+
     def run_forever(self):
         self.xt_trader.run_forever()
 
 if __name__ == "__main__":
+    # 演示脚本需要看到下单、查询结果，输出DEBUG级别日志
+    setup_logger(__name__).setLevel(logging.DEBUG)
     print("demo test")
     # path为mini qmt客户端安装目录下userdata_mini路径
     path = r'C:\国金证券QMT交易端\userdata_mini'
@@ -1,9 +1,20 @@
+import atexit
 import logging
-from datetime import datetime, timedelta
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timedelta, time as dt_time
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
+# 交易时段边界，模块加载时构造一次
+_OPEN = dt_time(9, 30, 0)
+_CLOSE = dt_time(15, 0, 0)
+
 def setup_logger(name: str) -> logging.Logger:
-    """设置日志记录器"""
+    """设置日志记录器
+    日志先写入队列，由后台线程输出到控制台和文件，调用线程不会阻塞在磁盘I/O上
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     
@@ -13,23 +24,29 @@ def setup_logger(name: str) -> logging.Logger:
     # 控制台输出
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
     
     # 文件输出
     file_handler = logging.FileHandler('strategy.log')
+    file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    
+    # 后台线程负责实际输出，进程退出时停止监听以写完队列中剩余的日志
+    log_queue = queue.Queue(-1)
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
     
     return logger
 
+@lru_cache(maxsize=32)
 def parse_time(time_str: str) -> datetime.time:
-    """将字符串时间转换为datetime.time对象"""
+    """将字符串时间转换为datetime.time对象，相同字符串只解析一次"""
     return datetime.strptime(time_str, '%H:%M:%S').time()
 
 def is_trading_time(current_time: datetime.time) -> bool:
     """判断当前时间是否为交易时间"""
-    return (current_time >= parse_time('09:30:00') and
-            current_time <= parse_time('15:00:00'))
+    return _OPEN <= current_time <= _CLOSE
 
 def format_tick_data(tick_data: pd.DataFrame) -> pd.DataFrame:
     """格式化tick数据"""
@@ -45,13 +62,17 @@ def calculate_change_rate(current_price, previous_price):
     计算涨跌幅
 
     参数:
-        current_price (float): 当前价格
-        previous_price (float): 前一个价格
+        current_price (float or np.ndarray): 当前价格
+        previous_price (float or np.ndarray): 前一个价格，支持与当前价格广播
 
     返回值:
-        float: 涨跌幅，例如 0.1 表示 10% 的涨幅，-0.05 表示 5% 的跌幅
+        float or np.ndarray: 涨跌幅，例如 0.1 表示 10% 的涨幅，-0.05 表示 5% 的跌幅；
+        前一个价格为0时涨跌幅为0。输入均为标量时返回float
     """
-    if previous_price == 0:
-        return 0  # 避免除以零
-    return (current_price - previous_price) / previous_price
+    current = np.asarray(current_price, dtype=np.float64)
+    previous = np.asarray(previous_price, dtype=np.float64)
+    is_zero = previous == 0
+    # 避免除以零：分母为0的位置先替换为1，结果再置0
+    rate = np.where(is_zero, 0.0, (current - previous) / np.where(is_zero, 1.0, previous))
+    return float(rate) if rate.ndim == 0 else rate
 